@@ -1,6 +1,11 @@
 """Context builder for assembling agent prompts — adapted for GigaChat."""
 
+import functools
+import io
+import os
 import platform
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -8,52 +13,20 @@ from gigabot.agent.memory import MemoryStore
 from gigabot.agent.skills import SkillsLoader
 
 
-class ContextBuilder:
-    BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
-
-    def __init__(self, workspace: Path):
-        self.workspace = workspace
-        self.memory = MemoryStore(workspace)
-        self.skills = SkillsLoader(workspace)
+@functools.cache
+def _runtime() -> str:
+    """Describe the host platform; constant for the lifetime of the process."""
+    system = platform.system()
+    return f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
 
-    def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
-        parts = []
-        parts.append(self._get_identity())
 
-        bootstrap = self._load_bootstrap_files()
-        if bootstrap:
-            parts.append(bootstrap)
+def _escape_braces(s: str) -> str:
+    return s.replace("{", "{{").replace("}", "}}")
 
-        memory = self.memory.get_memory_context()
-        if memory:
-            parts.append(f"# Память\n\n{memory}")
 
-        always_skills = self.skills.get_always_skills()
-        if always_skills:
-            always_content = self.skills.load_skills_for_context(always_skills)
-            if always_content:
-                parts.append(f"# Активные навыки\n\n{always_content}")
-
-        skills_summary = self.skills.build_skills_summary()
-        if skills_summary:
-            parts.append(f"""# Навыки
-
-Доступные навыки расширяют твои возможности. Чтобы использовать навык, прочитай его SKILL.md с помощью read_file.
-
-{skills_summary}""")
-
-        return "\n\n---\n\n".join(parts)
-
-    def _get_identity(self) -> str:
-        from datetime import datetime
-        import time as _time
-        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
-        tz = _time.strftime("%Z") or "UTC"
-        workspace_path = str(self.workspace.expanduser().resolve())
-        system = platform.system()
-        runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
-
-        return f"""# GigaBot 🤖
+# Static part of the system prompt. {workspace_path} and {runtime} are substituted
+# once per ContextBuilder; {now} and {tz} are filled in on every call.
+_IDENTITY_TEMPLATE = """# GigaBot 🤖
 
 Ты GigaBot — умный AI-ассистент на базе GigaChat для управления проектами и документами.
 
@@ -139,13 +112,132 @@ class ContextBuilder:
 ПРАВИЛО 7 — Shell-команды: используй exec, НЕ давай текстовую инструкцию.
 ПРАВИЛО 8 — НЕ повторяй вызов инструмента с теми же параметрами. Если получил ошибку — исправь параметры или ответь текстом."""
 
+
+_SECTION_SEP = "\n\n---\n\n"
+_SKILLS_INTRO = (
+    "Доступные навыки расширяют твои возможности. "
+    "Чтобы использовать навык, прочитай его SKILL.md с помощью read_file.\n\n"
+)
+
+
+class ContextBuilder:
+    BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
+
+    __slots__ = (
+        "workspace",
+        "memory",
+        "skills",
+        "_ws_str",
+        "_bootstrap_set",
+        "_workspace_path_str",
+        "_runtime_str",
+        "_identity_template",
+        "_bootstrap_cache",
+        "_identity_cache",
+        "_memory_cache",
+        "_skills_cache",
+        "_prompt_cache",
+    )
+
+    def __init__(self, workspace: Path):
+        self.workspace = workspace
+        self.memory = MemoryStore(workspace)
+        self.skills = SkillsLoader(workspace)
+        self._ws_str = os.fspath(workspace)
+        self._bootstrap_set = frozenset(self.BOOTSTRAP_FILES)
+        self._workspace_path_str = str(workspace.expanduser().resolve())
+        self._runtime_str = _runtime()
+        self._identity_template = (
+            _IDENTITY_TEMPLATE
+            .replace("{workspace_path}", _escape_braces(self._workspace_path_str))
+            .replace("{runtime}", _escape_braces(self._runtime_str))
+        )
+        self._bootstrap_cache: dict[str, tuple[int, str]] = {}
+        self._identity_cache: tuple[tuple[str, str], str] | None = None
+        self._memory_cache: tuple[tuple[int, int, int], str] | None = None
+        self._skills_cache: tuple[tuple, tuple[str, str]] | None = None
+        self._prompt_cache: tuple[tuple[tuple[str | None, str], ...], str] | None = None
+
+    def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
+        sections: list[tuple[str | None, str]] = [(None, self._get_identity())]
+
+        bootstrap = self._load_bootstrap_files()
+        if bootstrap:
+            sections.append((None, bootstrap))
+
+        memory = self._get_memory_context()
+        if memory:
+            sections.append(("Память", memory))
+
+        always_content, skills_summary = self._get_skills_context()
+        if always_content:
+            sections.append(("Активные навыки", always_content))
+        if skills_summary:
+            sections.append(("Навыки", _SKILLS_INTRO + skills_summary))
+
+        # Repeated calls within a turn (and across turns in the same minute) see
+        # the same segments; reuse the already materialized prompt in that case.
+        key = tuple(sections)
+        if self._prompt_cache is not None and self._prompt_cache[0] == key:
+            return self._prompt_cache[1]
+
+        buf = io.StringIO()
+        for title, body in sections:
+            if buf.tell():
+                buf.write(_SECTION_SEP)
+            if title:
+                buf.write("# ")
+                buf.write(title)
+                buf.write("\n\n")
+            buf.write(body)
+        prompt = buf.getvalue()
+        self._prompt_cache = (key, prompt)
+        return prompt
+
+    def _get_memory_context(self) -> str:
+        version = self.memory.version
+        if self._memory_cache is None or self._memory_cache[0] != version:
+            self._memory_cache = (version, self.memory.get_memory_context())
+        return self._memory_cache[1]
+
+    def _get_skills_context(self) -> tuple[str, str]:
+        """Return (always-on skills content, skills summary), rebuilt only when skills change."""
+        version = self.skills.version
+        if self._skills_cache is None or self._skills_cache[0] != version:
+            always_skills = self.skills.get_always_skills()
+            always_content = self.skills.load_skills_for_context(always_skills) if always_skills else ""
+            self._skills_cache = (version, (always_content, self.skills.build_skills_summary()))
+        return self._skills_cache[1]
+
+    def _get_identity(self) -> str:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
+        tz = time.strftime("%Z") or "UTC"
+        if self._identity_cache is None or self._identity_cache[0] != (now, tz):
+            self._identity_cache = ((now, tz), self._identity_template.format(now=now, tz=tz))
+        return self._identity_cache[1]
+
     def _load_bootstrap_files(self) -> str:
+        try:
+            with os.scandir(self._ws_str) as it:
+                entries = {e.name: e for e in it if e.name in self._bootstrap_set}
+        except FileNotFoundError:
+            return ""
+
         parts = []
         for filename in self.BOOTSTRAP_FILES:
-            file_path = self.workspace / filename
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
-                parts.append(f"## {filename}\n\n{content}")
+            entry = entries.get(filename)
+            if entry is None:
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+                cached = self._bootstrap_cache.get(filename)
+                if cached is None or cached[0] != mtime:
+                    with open(entry.path, encoding="utf-8") as f:
+                        cached = (mtime, f"## {filename}\n\n{f.read()}")
+                    self._bootstrap_cache[filename] = cached
+            except (FileNotFoundError, IsADirectoryError):
+                continue
+            parts.append(cached[1])
         return "\n\n".join(parts) if parts else ""
 
     def build_messages(
@@ -161,7 +253,9 @@ class ContextBuilder:
 
         system_prompt = self.build_system_prompt(skill_names)
         if channel and chat_id:
-            system_prompt += f"\n\n## Текущая сессия\nКанал: {channel}\nChat ID: {chat_id}"
+            system_prompt = "".join((
+                system_prompt, "\n\n## Текущая сессия\nКанал: ", channel, "\nChat ID: ", chat_id,
+            ))
         messages.append({"role": "system", "content": system_prompt})
 
         messages.extend(history)
@@ -176,14 +270,12 @@ class ContextBuilder:
         if not media:
             return text
 
-        file_refs = []
-        for path in media:
-            p = Path(path)
-            if p.is_file():
-                file_refs.append(f"[file: {path}]")
+        # One stat per attachment: media usually lives in a single, ever-growing
+        # directory, so listing it would cost more than the few files checked.
+        file_refs = [f"[file: {path}]" for path in media if os.path.isfile(path)]
 
         if file_refs:
-            return text + "\n" + "\n".join(file_refs)
+            return "\n".join((text, *file_refs))
         return text
 
     def add_tool_result(
@@ -206,13 +298,13 @@ class ContextBuilder:
         messages: list[dict[str, Any]],
         content: str | None,
         tool_calls: list[dict[str, Any]] | None = None,
-        reasoning_content: str | None = None,
         functions_state_id: str | None = None,
     ) -> list[dict[str, Any]]:
-        msg: dict[str, Any] = {"role": "assistant", "content": content}
-        if tool_calls:
-            msg["tool_calls"] = tool_calls
-        if functions_state_id:
-            msg["functions_state_id"] = functions_state_id
+        msg: dict[str, Any] = {
+            "role": "assistant",
+            "content": content,
+            **({"tool_calls": tool_calls} if tool_calls else {}),
+            **({"functions_state_id": functions_state_id} if functions_state_id else {}),
+        }
         messages.append(msg)
         return messages
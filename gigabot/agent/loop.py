@@ -144,6 +144,13 @@ class AgentLoop:
                 workspace=self.workspace,
             ))
 
+    def _drop_unavailable_tools(self) -> None:
+        """Unregister tools whose backend turned out to be broken after start-up."""
+        if rag_tool := self.tools.get("knowledge"):
+            if isinstance(rag_tool, RAGTool) and (error := rag_tool.import_error) is not None:
+                logger.warning("RAG tool not available: {}", error)
+                self.tools.unregister("knowledge")
+
     def _set_tool_context(self, channel: str, chat_id: str, message_id: str | None = None) -> None:
         """Update context for all tools that need routing info."""
         if message_tool := self.tools.get("message"):
@@ -243,6 +250,7 @@ class AgentLoop:
         tools_used: list[str] = []
         recent_calls: list[tuple[str, str]] = []
         file_refs = self._extract_file_refs(messages)
+        self._drop_unavailable_tools()
 
         while iteration < self.max_iterations:
             iteration += 1
@@ -378,6 +386,15 @@ class AgentLoop:
         self._running = False
         logger.info("Agent loop stopping")
 
+    async def aclose(self) -> None:
+        """Release resources held by tools (HTTP clients, cache files)."""
+        if rag_tool := self.tools.get("knowledge"):
+            if isinstance(rag_tool, RAGTool):
+                rag_tool.close()
+        if voice_tool := self.tools.get("voice_note"):
+            if isinstance(voice_tool, SaluteSpeechTool):
+                await voice_tool.aclose()
+
     async def _process_message(
         self,
         msg: InboundMessage,
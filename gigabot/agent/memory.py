@@ -48,6 +48,16 @@ class MemoryStore:
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        self._writes = 0
+
+    @property
+    def version(self) -> tuple[int, int, int]:
+        """Changes whenever MEMORY.md is written here or modified on disk."""
+        try:
+            st = self.memory_file.stat()
+        except FileNotFoundError:
+            return (self._writes, 0, -1)
+        return (self._writes, st.st_mtime_ns, st.st_size)
 
     def read_long_term(self) -> str:
         if self.memory_file.exists():
@@ -56,6 +66,7 @@ class MemoryStore:
 
     def write_long_term(self, content: str) -> None:
         self.memory_file.write_text(content, encoding="utf-8")
+        self._writes += 1
 
     def append_history(self, entry: str) -> None:
         with open(self.history_file, "a", encoding="utf-8") as f:
@@ -14,6 +14,54 @@ class SkillsLoader:
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
+        # Binaries and env vars the skills require, re-read only when a SKILL.md changes.
+        self._requires: tuple[tuple, tuple[tuple[str, ...], tuple[str, ...]]] | None = None
+
+    @property
+    def version(self) -> tuple:
+        """Fingerprint of the skills prompt.
+
+        Changes when a SKILL.md is added, removed or edited, and when one of
+        the binaries or env vars a skill requires appears or disappears, since
+        that flips the skill's ``available`` flag.
+        """
+        stamps = self._stamps()
+        if self._requires is None or self._requires[0] != stamps:
+            self._requires = (stamps, self._collect_requirements())
+        bins, envs = self._requires[1]
+        return (
+            stamps,
+            tuple(shutil.which(b) is not None for b in bins),
+            tuple(bool(os.environ.get(env)) for env in envs),
+        )
+
+    def _stamps(self) -> tuple[tuple[str, int, int], ...]:
+        stamps = []
+        for root in (self.workspace_skills, self.builtin_skills):
+            if not root:
+                continue
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        if not entry.is_dir():
+                            continue
+                        try:
+                            st = os.stat(os.path.join(entry.path, "SKILL.md"))
+                        except OSError:
+                            continue
+                        stamps.append((entry.path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                continue
+        return tuple(sorted(stamps))
+
+    def _collect_requirements(self) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        bins: set[str] = set()
+        envs: set[str] = set()
+        for s in self.list_skills(filter_unavailable=False):
+            requires = self._get_skill_meta(s["name"]).get("requires", {})
+            bins.update(requires.get("bins", []))
+            envs.update(requires.get("env", []))
+        return tuple(sorted(bins)), tuple(sorted(envs))
 
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         skills = []
@@ -1,8 +1,11 @@
 """Subagent manager for background task execution."""
 
 import asyncio
-import json
+import functools
+import time
 import uuid
+import weakref
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -15,6 +18,50 @@ from gigabot.agent.tools.registry import ToolRegistry
 from gigabot.agent.tools.filesystem import FileTool
 from gigabot.agent.tools.shell import ExecTool
 from gigabot.agent.tools.web import WebTool
+from gigabot.utils.helpers import json_dumps
+
+
+# {workspace} is substituted once per manager, {now} and {tz} per subagent.
+_SUBAGENT_PROMPT_TEMPLATE = """# Субагент GigaBot
+
+## Текущее время
+{now} ({tz})
+
+Ты субагент, запущенный основным агентом GigaBot для выполнения конкретной задачи.
+
+## Правила
+1. Сосредоточься — выполняй только поставленную задачу, ничего лишнего
+2. Твой финальный ответ будет передан основному агенту
+3. Не начинай разговоры и не берись за побочные задачи
+4. Будь кратким, но информативным в своих выводах
+
+## Что ты можешь делать
+- Читать и писать файлы в рабочем пространстве
+- Выполнять команды оболочки
+- Искать в интернете и загружать веб-страницы
+- Полноценно выполнять задачу
+
+## Чего ты не можешь делать
+- Отправлять сообщения пользователям напрямую (нет инструмента message)
+- Запускать других субагентов
+- Получать доступ к истории разговора основного агента
+
+## Рабочее пространство
+Путь: {workspace}
+Навыки: {workspace}/skills/ (читай SKILL.md файлы по необходимости)
+
+Когда задача выполнена, предоставь чёткое резюме своих выводов или действий."""
+
+
+def _task_done(
+    task_id: str,
+    manager_ref: "weakref.ReferenceType[SubagentManager]",
+    _task: asyncio.Task[None],
+) -> None:
+    """Done-callback: forget a finished subagent without a per-task closure."""
+    manager = manager_ref()
+    if manager is not None:
+        manager._running_tasks.pop(task_id, None)
 
 
 class SubagentManager:
@@ -26,6 +73,23 @@ class SubagentManager:
     isolated context and a focused system prompt.
     """
 
+    __slots__ = (
+        "provider",
+        "workspace",
+        "bus",
+        "model",
+        "temperature",
+        "max_tokens",
+        "brave_api_key",
+        "exec_config",
+        "restrict_to_workspace",
+        "_prompt_template",
+        "_tools",
+        "max_concurrent",
+        "_running_tasks",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         provider: LLMProvider,
@@ -37,6 +101,7 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        max_concurrent: int = 8,
     ):
         from gigabot.config.schema import ExecToolConfig
         self.provider = provider
@@ -48,6 +113,10 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_concurrent = max_concurrent
+        workspace_str = str(workspace).replace("{", "{{").replace("}", "}}")
+        self._prompt_template = _SUBAGENT_PROMPT_TEMPLATE.replace("{workspace}", workspace_str)
+        self._tools = self._build_tools()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
 
     async def spawn(
@@ -69,6 +138,12 @@ class SubagentManager:
         Returns:
             Status message indicating the subagent was started.
         """
+        if len(self._running_tasks) >= self.max_concurrent:
+            return (
+                f"Error: too many subagents running ({len(self._running_tasks)}/{self.max_concurrent}). "
+                "Wait for one of them to finish before spawning another."
+            )
+
         task_id = str(uuid.uuid4())[:8]
         display_label = label or task[:30] + ("..." if len(task) > 30 else "")
 
@@ -82,7 +157,7 @@ class SubagentManager:
         )
         self._running_tasks[task_id] = bg_task
 
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        bg_task.add_done_callback(functools.partial(_task_done, task_id, weakref.ref(self)))
 
         logger.info("Spawned subagent [{}]: {}", task_id, display_label)
         return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
@@ -98,22 +173,17 @@ class SubagentManager:
         logger.info("Subagent [{}] starting task: {}", task_id, label)
 
         try:
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            tools.register(FileTool(workspace=self.workspace, allowed_dir=allowed_dir))
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.restrict_to_workspace,
-            ))
-            tools.register(WebTool(api_key=self.brave_api_key))
-
+            tools = self._tools
             system_prompt = self._build_subagent_prompt(task)
             messages: list[dict[str, Any]] = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": task},
             ]
 
+            # The system prompt and tool schemas are static for the whole run;
+            # build them once instead of on every provider round-trip.
+            tool_definitions = tools.get_definitions()
+
             max_iterations = 15
             iteration = 0
             final_result: str | None = None
@@ -123,23 +193,28 @@ class SubagentManager:
 
                 response = await self.provider.chat(
                     messages=messages,
-                    tools=tools.get_definitions(),
+                    tools=tool_definitions,
                     model=self.model,
                     temperature=self.temperature,
                     max_tokens=self.max_tokens,
                 )
 
                 if response.has_tool_calls:
+                    _dumps = json_dumps
+                    serialized = [
+                        (tc, _dumps(tc.arguments))
+                        for tc in response.tool_calls
+                    ]
                     tool_call_dicts = [
                         {
                             "id": tc.id,
                             "type": "function",
                             "function": {
                                 "name": tc.name,
-                                "arguments": json.dumps(tc.arguments, ensure_ascii=False),
+                                "arguments": args_str,
                             },
                         }
-                        for tc in response.tool_calls
+                        for tc, args_str in serialized
                     ]
                     messages.append({
                         "role": "assistant",
@@ -147,8 +222,7 @@ class SubagentManager:
                         "tool_calls": tool_call_dicts,
                     })
 
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                    for tool_call, args_str in serialized:
                         logger.debug("Subagent [{}] executing: {} with arguments: {}", task_id, tool_call.name, args_str)
                         result = await tools.execute(tool_call.name, tool_call.arguments)
                         messages.append({
@@ -205,40 +279,23 @@ Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not men
 
     def _build_subagent_prompt(self, task: str) -> str:
         """Build a focused system prompt for the subagent."""
-        from datetime import datetime
-        import time as _time
         now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
-        tz = _time.strftime("%Z") or "UTC"
-
-        return f"""# Субагент GigaBot
-
-## Текущее время
-{now} ({tz})
-
-Ты субагент, запущенный основным агентом GigaBot для выполнения конкретной задачи.
-
-## Правила
-1. Сосредоточься — выполняй только поставленную задачу, ничего лишнего
-2. Твой финальный ответ будет передан основному агенту
-3. Не начинай разговоры и не берись за побочные задачи
-4. Будь кратким, но информативным в своих выводах
-
-## Что ты можешь делать
-- Читать и писать файлы в рабочем пространстве
-- Выполнять команды оболочки
-- Искать в интернете и загружать веб-страницы
-- Полноценно выполнять задачу
-
-## Чего ты не можешь делать
-- Отправлять сообщения пользователям напрямую (нет инструмента message)
-- Запускать других субагентов
-- Получать доступ к истории разговора основного агента
-
-## Рабочее пространство
-Путь: {self.workspace}
-Навыки: {self.workspace}/skills/ (читай SKILL.md файлы по необходимости)
-
-Когда задача выполнена, предоставь чёткое резюме своих выводов или действий."""
+        tz = time.strftime("%Z") or "UTC"
+        return self._prompt_template.format(now=now, tz=tz)
+
+    def _build_tools(self) -> ToolRegistry:
+        """Build the subagent tool set. The tools only hold configuration, so
+        a single registry is shared by every subagent of this manager."""
+        tools = ToolRegistry()
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        tools.register(FileTool(workspace=self.workspace, allowed_dir=allowed_dir))
+        tools.register(ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            restrict_to_workspace=self.restrict_to_workspace,
+        ))
+        tools.register(WebTool(api_key=self.brave_api_key))
+        return tools
 
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
@@ -1,53 +1,272 @@
 """File-system tools: file operations and project management."""
 
+import asyncio
+import codecs
+import contextlib
 import difflib
-import mimetypes
+import functools
+import importlib
+import io
+import itertools
+import mmap
+import multiprocessing
+import os
+import re
 import shutil
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Any
 
 from gigabot.agent.tools.base import Tool
 
 
+@functools.cache
+def _optional_import(name: str) -> Any:
+    """Import *name* on first use; ``None`` when it is not installed.
+
+    The document parsers are heavy to import (pdfplumber alone pulls in
+    pdfminer and cryptography), so they load only when a file needs them.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Helper readers / writers
 # ---------------------------------------------------------------------------
 
+_PDF_PARALLEL_MIN_PAGES = 10
+_PDF_PAGES_PER_TASK = 10
+_PDF_MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+
+# None of the PDF engines is thread-safe. Calls made in this process (page
+# counts, short documents) take _PDF_ENGINE_LOCK; longer documents go to
+# the process pool, where each worker is single-threaded.
+_PDF_ENGINE_LOCK = threading.Lock()
+_PDF_POOL_LOCK = threading.Lock()
+_pdf_pool_executor: ProcessPoolExecutor | None = None
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for multi-page PDF extraction, started on first use and kept.
+
+    Workers are spawned, not forked, since the bot process runs threads.
+    """
+    global _pdf_pool_executor
+    with _PDF_POOL_LOCK:
+        if _pdf_pool_executor is None:
+            _pdf_pool_executor = ProcessPoolExecutor(
+                max_workers=_PDF_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool_executor
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next document starts a fresh one."""
+    global _pdf_pool_executor
+    with _PDF_POOL_LOCK:
+        if _pdf_pool_executor is pool:
+            _pdf_pool_executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@functools.cache
+def _pdf_backend() -> Any:
+    """The fastest installed PDF engine, decided once: PyMuPDF (reading-order
+    text), then the PDFium bindings, then pure-Python pdfplumber."""
+    for name in ("pymupdf", "pypdfium2", "pdfplumber"):
+        module = _optional_import(name)
+        if module is not None:
+            return module
+    return None
+
+
+def _pdf_page_count(file_path: Path) -> int:
+    """Return the number of pages in a PDF."""
+    backend = _pdf_backend()
+    with _PDF_ENGINE_LOCK:
+        if backend.__name__ == "pymupdf":
+            with backend.open(file_path) as doc:
+                return doc.page_count
+        if backend.__name__ == "pypdfium2":
+            pdf = backend.PdfDocument(str(file_path))
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        with backend.open(file_path) as pdf:
+            return len(pdf.pages)
+
+
+def _iter_pdf_page_range(file_path: Path, start: int, stop: int) -> Iterator[str]:
+    """Yield the text of pages ``[start, stop)``, one page at a time."""
+    backend = _pdf_backend()
+    if backend.__name__ == "pymupdf":
+        with backend.open(file_path) as doc:
+            for index in range(start, stop):
+                yield doc[index].get_text("text").rstrip("\n")
+        return
+    if backend.__name__ == "pypdfium2":
+        pdf = backend.PdfDocument(str(file_path))
+        try:
+            for index in range(start, stop):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                yield textpage.get_text_range().replace("\r\n", "\n")
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return
+    with backend.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text() or ""
+
+
+def _extract_pdf_pages(file_path: Path, start: int, stop: int) -> list[str]:
+    """Extract text of pages ``[start, stop)``; runs in a worker process."""
+    return list(_iter_pdf_page_range(file_path, start, stop))
+
+
+def _iter_pdf_pages(file_path: Path) -> Iterator[str]:
+    """Yield the text of every page of a PDF, in order.
+
+    Documents with ``_PDF_PARALLEL_MIN_PAGES`` pages or more are split into
+    page ranges and extracted in the shared process pool; only a window of
+    two ranges per worker is in flight, so memory stays bounded on huge files. Small
+    documents stay serial to avoid the pool start-up cost.
+    """
+    page_count = _pdf_page_count(file_path)
+    if page_count < _PDF_PARALLEL_MIN_PAGES:
+        # Read in full while holding the lock, so a consumer that stops
+        # early never leaves the engine locked.
+        with _PDF_ENGINE_LOCK:
+            texts = _extract_pdf_pages(file_path, 0, page_count)
+        yield from texts
+        return
+    starts = range(0, page_count, _PDF_PAGES_PER_TASK)
+    window = _PDF_MAX_WORKERS * 2
+    pool = _pdf_pool()
+    try:
+        for offset in range(0, len(starts), window):
+            batch_starts = starts[offset:offset + window]
+            batch_stops = [min(start + _PDF_PAGES_PER_TASK, page_count) for start in batch_starts]
+            for texts in pool.map(
+                _extract_pdf_pages, [file_path] * len(batch_starts), batch_starts, batch_stops,
+            ):
+                yield from texts
+    except BrokenProcessPool:
+        _discard_pdf_pool(pool)
+        raise
+
+
+def _iter_pdf_text(file_path: Path) -> Iterator[str]:
+    """Yield the non-blank pages of a PDF and the blank lines between them.
+
+    Joined, the pieces are exactly the text ``_read_pdf`` returns.
+    """
+    first = True
+    for text in _iter_pdf_pages(file_path):
+        if text.strip():
+            if not first:
+                yield "\n\n"
+            first = False
+            yield text
+
+
 def _read_pdf(file_path: Path) -> str:
     """Extract text from a PDF file."""
-    try:
-        import pdfplumber
-    except ImportError:
+    if _pdf_backend() is None:
         return "Error: Reading PDF requires the pdfplumber package. Install with: pip install pdfplumber"
     try:
-        with pdfplumber.open(file_path) as pdf:
-            parts = []
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    parts.append(text)
-            return "\n\n".join(parts) if parts else "The PDF file contains no extractable text (may be scanned/image-only)."
+        out = io.StringIO()
+        for text in _iter_pdf_text(file_path):
+            out.write(text)
+        return out.getvalue() or "The PDF file contains no extractable text (may be scanned/image-only)."
     except Exception as e:
         return f"Error reading PDF: {e}"
 
 
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+
+def _docx_main_part(zf: zipfile.ZipFile) -> str:
+    """Name of the main document part, as declared in ``_rels/.rels``."""
+    rels = _optional_import("lxml.etree").fromstring(zf.read("_rels/.rels"))
+    for rel in rels:
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def _iter_docx_body(file_path: Path) -> Iterator[Any]:
+    """Yield the top-level ``<w:p>`` and ``<w:tbl>`` elements of a DOCX body.
+
+    The main part is parsed incrementally with python-docx's element classes
+    (so ``CT_P.text`` maps tabs, breaks and hyperlinks as usual), and each
+    element is dropped once the caller is done with it.
+    """
+    parser = _optional_import("lxml.etree").XMLPullParser(
+        events=("end",), tag=(f"{_W_NS}p", f"{_W_NS}tbl"), remove_blank_text=True,
+    )
+    parser.set_element_class_lookup(_optional_import("docx.oxml.parser").element_class_lookup)
+    body_tag = f"{_W_NS}body"
+    with zipfile.ZipFile(file_path) as zf, zf.open(_docx_main_part(zf)) as f:
+        root = None
+        while True:
+            data = f.read(64 * 1024)
+            if data:
+                parser.feed(data)
+            else:
+                root = parser.close()
+            for _, elem in parser.read_events():
+                parent = elem.getparent()
+                if parent is None or parent.tag != body_tag:
+                    continue
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+            if not data:
+                break
+    if root is None or root.tag != f"{_W_NS}document":
+        raise ValueError(f"file '{file_path}' is not a Word file")
+
+
 def _read_docx(file_path: Path) -> str:
     """Extract text and table content from a DOCX file."""
-    try:
-        import docx
-    except ImportError:
+    if _optional_import("docx") is None:
         return "Error: python-docx not installed"
     try:
-        doc = docx.Document(str(file_path))
+        # Body paragraphs come first, then table rows, so rows are held back
+        # until the end; everything else is released as soon as it is read.
         parts = []
-        for para in doc.paragraphs:
-            if para.text.strip():
-                parts.append(para.text)
-        for table in doc.tables:
-            for row in table.rows:
-                cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+        rows = []
+        for elem in _iter_docx_body(file_path):
+            if elem.tag == f"{_W_NS}p":
+                text = elem.text
+                if text.strip():
+                    parts.append(text)
+                continue
+            for tr in elem.tr_lst:
+                cells = []
+                for tc in tr.tc_lst:
+                    text = "\n".join(p.text for p in tc.p_lst).strip()
+                    if text:
+                        cells.append(text)
                 if cells:
-                    parts.append(" | ".join(cells))
+                    rows.append(" | ".join(cells))
+        parts.extend(rows)
         if not parts:
             return "The DOCX file contains no text."
         return "\n".join(parts)
@@ -55,82 +274,372 @@ def _read_docx(file_path: Path) -> str:
         return f"Error reading DOCX: {e}"
 
 
+def _calamine_value(value: Any) -> Any:
+    """Match openpyxl, which returns whole numbers as int rather than float."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _excel_sheets(file_path: Path) -> Iterator[tuple[str, Iterator[Any]]]:
+    """Yield ``(title, rows)`` for each sheet, preferring the calamine reader."""
+    calamine = _optional_import("python_calamine")
+    if calamine is not None:
+        wb = calamine.CalamineWorkbook.from_path(str(file_path))
+        for name in wb.sheet_names:
+            rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=False)
+            yield name, ([_calamine_value(v) for v in row] for row in rows)
+        return
+    wb = _optional_import("openpyxl").load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in wb.worksheets:
+            yield sheet.title, sheet.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
 def _read_excel(file_path: Path) -> str:
     """Extract data from an Excel file (.xlsx / .xls)."""
-    try:
-        import openpyxl
-    except ImportError:
+    if _optional_import("python_calamine") is None and _optional_import("openpyxl") is None:
         return "Error: Reading Excel requires the openpyxl package. Install with: pip install openpyxl"
     try:
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        parts: list[str] = []
-        for sheet in wb.worksheets:
-            rows = list(sheet.iter_rows(values_only=True))
-            if rows:
-                parts.append(f"Sheet: {sheet.title}")
-                for row in rows:
-                    parts.append("\t".join(str(c) if c is not None else "" for c in row))
-        wb.close()
-        return "\n".join(parts) if parts else "The Excel file contains no data."
+        buf = io.StringIO()
+        join = "\t".join
+        with contextlib.closing(_excel_sheets(file_path)) as sheets:
+            for title, rows in sheets:
+                first = next(rows, None)
+                if first is None:
+                    continue
+                buf.write(f"Sheet: {title}\n")
+                for row in itertools.chain((first,), rows):
+                    buf.write(join(["" if c is None else str(c) for c in row]))
+                    buf.write("\n")
+        return buf.getvalue()[:-1] or "The Excel file contains no data."
     except Exception as e:
         return f"Error reading Excel: {e}"
 
 
-def _read_text_with_encoding(file_path: Path) -> str:
-    """Read a text file, trying UTF-8 then common fallbacks."""
-    raw = file_path.read_bytes()
-    for encoding in ("utf-8", "utf-8-sig", "cp1251", "latin-1"):
+_ENCODING_PROBE_BYTES = 64 * 1024
+
+
+def _decodes(probe: bytes, encoding: str, final: bool) -> bool:
+    """Whether *probe* decodes cleanly as *encoding*."""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(probe, final=final)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+# UTF-32 BOMs first: the UTF-32-LE BOM starts with the UTF-16-LE one.
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+# Below this the detectors guess wildly (cp1251 "Привет мир" comes back as
+# cp1125, "Да" as big5), so short files keep the plain cp1251 fallback.
+_DETECT_MIN_BYTES = 4 * 1024
+_DETECT_MIN_CONFIDENCE = 0.5
+
+
+def _detect_encoding(probe: bytes) -> str | None:
+    """Ask an installed charset detector (cchardet, then charset_normalizer).
+
+    Only a confident answer about a long enough sample is returned; for
+    charset_normalizer that means it also recognised a language in the text.
+    """
+    if len(probe) < _DETECT_MIN_BYTES:
+        return None
+    encoding = None
+    cchardet = _optional_import("cchardet")
+    charset_normalizer = _optional_import("charset_normalizer")
+    if cchardet is not None:
+        result = cchardet.detect(probe)
+        if (result.get("confidence") or 0) >= _DETECT_MIN_CONFIDENCE:
+            encoding = result.get("encoding")
+    elif charset_normalizer is not None:
+        match = charset_normalizer.from_bytes(probe).best()
+        if match is not None and match.coherence > 0:
+            encoding = match.encoding
+    if encoding is None:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def _probe_encoding(probe: bytes, final: bool) -> str:
+    """Pick the encoding for a file from its first bytes.
+
+    A BOM settles it outright; otherwise UTF-8 is tried, then a charset
+    detector when one is installed and the probe is long enough to trust it,
+    then a cp1251 / latin-1 fallback.
+    """
+    for bom, encoding in _BOMS:
+        if probe.startswith(bom):
+            return encoding
+    if _decodes(probe, "utf-8", final):
+        return "utf-8"
+    encoding = _detect_encoding(probe)
+    if encoding is not None:
+        return encoding
+    return "cp1251" if _decodes(probe, "cp1251", final) else "latin-1"
+
+
+def _candidate_encodings(raw: bytes, probed: str) -> Iterator[str]:
+    """Encodings to try, in order, for decoding all of *raw*.
+
+    The probe only saw the first 64 KB, so when its pick fails on the full
+    buffer the detector is asked about the rest of the text, where the
+    offending bytes are, before falling back to the fixed UTF-8 / cp1251 /
+    latin-1 chain.
+    """
+    seen = {probed}
+    yield probed
+    if len(raw) > _ENCODING_PROBE_BYTES:
+        detected = _detect_encoding(raw[_ENCODING_PROBE_BYTES:])
+        if detected is not None and detected not in seen:
+            seen.add(detected)
+            yield detected
+    for encoding in ("utf-8", "cp1251", "latin-1"):
+        if encoding not in seen:
+            seen.add(encoding)
+            yield encoding
+
+
+# What the file tool hands the model; anything past this would not fit in a
+# model context anyway. RAG indexing reads whole files.
+_MAX_TEXT_BYTES = 10 * 1024 * 1024
+
+
+def _read_text_with_encoding(file_path: Path, max_bytes: int | None = None) -> str:
+    """Read a text file, trying UTF-8 then common fallbacks.
+
+    The first 64 KB pick the most likely encoding, which must then decode the
+    whole text strictly; if it does not, the candidates from
+    ``_candidate_encodings`` are tried, and only as a last resort are bad
+    bytes replaced. With *max_bytes* only that much is decoded and a longer
+    file is cut with a marker.
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read(-1 if max_bytes is None else max_bytes)
+        truncated = max_bytes is not None and bool(f.read(1))
+    final = not truncated
+    probed = _probe_encoding(
+        raw[:_ENCODING_PROBE_BYTES], final=final and len(raw) <= _ENCODING_PROBE_BYTES,
+    )
+    # Incremental decoders drop a multibyte character split by the cap
+    # instead of failing on it.
+    for encoding in _candidate_encodings(raw, probed):
         try:
-            return raw.decode(encoding)
+            text = codecs.getincrementaldecoder(encoding)().decode(raw, final=final)
+            break
         except UnicodeDecodeError:
             continue
-    return raw.decode("utf-8", errors="replace")
-
+    else:
+        text = codecs.getincrementaldecoder("utf-8")(errors="replace").decode(raw, final=final)
+    if truncated:
+        text += f"\n[...truncated: only the first {max_bytes // (1024 * 1024)} MB is shown]\n"
+    return text
+
+
+_IMAGE_EXTS = frozenset({
+    ".jpg", ".jpeg", ".jpe", ".jfif", ".png", ".apng", ".gif", ".webp", ".bmp",
+    ".tif", ".tiff", ".ico", ".heic", ".heif", ".avif", ".jxl", ".jp2",
+    ".svg", ".svgz", ".psd", ".xcf", ".pbm", ".pgm", ".ppm", ".pnm",
+    ".cr2", ".nef", ".orf", ".emf", ".wmf", ".djvu", ".djv",
+})
+
+
+_DOCUMENT_EXTS = frozenset({".pdf", ".docx", ".doc", ".xlsx", ".xls"})
+# Document extraction is CPU-heavy; a small dedicated pool keeps a burst of
+# big reads from taking over the default to_thread executor.
+_DOCUMENT_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gigabot-docs")
+
+_READ_CACHE: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+_READ_CACHE_MAX = 32
+# Cyrillic text costs two bytes per character in a str, so this is ~4 MB;
+# a document longer than that is far past what a model context can take.
+_READ_CACHE_CHARS_MAX = 2_000_000
+_READ_CACHE_LOCK = threading.Lock()
+_read_cache_chars = 0
+
+
+def _read_document(file_path: Path, ext: str) -> str:
+    """Extract text from a PDF, Word or Excel file, memoised on mtime and size.
+
+    Extraction is by far the slowest read path and the agent often re-reads
+    the same document within a conversation. Error results are not cached.
+    """
+    global _read_cache_chars
+    try:
+        st = file_path.stat()
+        key = (str(file_path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    with _READ_CACHE_LOCK:
+        text = _READ_CACHE.get(key)
+        if text is not None:
+            _READ_CACHE.move_to_end(key)
+            return text
 
-def _smart_read(file_path: Path) -> str:
-    """Dispatch to the correct reader based on file extension."""
-    ext = file_path.suffix.lower()
     if ext == ".pdf":
-        return _read_pdf(file_path)
-    if ext in (".docx", ".doc"):
-        return _read_docx(file_path)
-    if ext in (".xlsx", ".xls"):
-        return _read_excel(file_path)
-    mime = mimetypes.guess_type(str(file_path))[0] or ""
-    if mime.startswith("image/"):
+        text = _read_pdf(file_path)
+    elif ext in (".docx", ".doc"):
+        text = _read_docx(file_path)
+    else:
+        text = _read_excel(file_path)
+    if key is None or text.startswith("Error") or len(text) > _READ_CACHE_CHARS_MAX:
+        return text
+
+    with _READ_CACHE_LOCK:
+        if key not in _READ_CACHE:
+            _READ_CACHE[key] = text
+            _read_cache_chars += len(text)
+        while len(_READ_CACHE) > _READ_CACHE_MAX or _read_cache_chars > _READ_CACHE_CHARS_MAX:
+            _read_cache_chars -= len(_READ_CACHE.popitem(last=False)[1])
+    return text
+
+
+def _smart_read(file_path: Path, max_text_bytes: int | None = None) -> str:
+    """Dispatch to the correct reader based on file extension.
+
+    *max_text_bytes* caps plain-text files only; see _read_text_with_encoding.
+    """
+    ext = file_path.suffix.lower()
+    if ext in _DOCUMENT_EXTS:
+        return _read_document(file_path, ext)
+    if ext in _IMAGE_EXTS:
         return f"This is an image file ({file_path.suffix}). Use other tools to process images."
-    return _read_text_with_encoding(file_path)
+    return _read_text_with_encoding(file_path, max_text_bytes)
 
 
 def _write_docx(file_path: Path, content: str) -> str:
     """Create a DOCX file with the given text content."""
-    try:
-        import docx
-    except ImportError:
+    docx = _optional_import("docx")
+    if docx is None:
         return "Error: Creating DOCX requires python-docx. Install with: pip install python-docx"
     doc = docx.Document()
+    # Document.add_paragraph looks up the trailing sectPr on every call, which
+    # is linear in the body size; build the <w:p> elements directly and slot
+    # each one in front of sectPr instead.
+    body = doc.element.body
+    sect_pr = body.sectPr
     for block in content.strip().split("\n\n"):
-        doc.add_paragraph(block.replace("\n", " "))
+        p = docx.oxml.OxmlElement("w:p")
+        text = block.replace("\n", " ")
+        if text:
+            p.add_r().text = text
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
     doc.save(str(file_path))
     return f"Successfully wrote DOCX to {file_path}"
 
 
 def _write_xlsx(file_path: Path, content: str) -> str:
     """Create an XLSX file.  Rows split by newline, columns by tab."""
-    try:
-        import openpyxl
-    except ImportError:
+    openpyxl = _optional_import("openpyxl")
+    if openpyxl is None:
         return "Error: Creating Excel requires openpyxl. Install with: pip install openpyxl"
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    for row_idx, line in enumerate(content.strip().splitlines(), start=1):
-        cells = line.split("\t")
-        for col_idx, val in enumerate(cells, start=1):
-            ws.cell(row=row_idx, column=col_idx, value=val.strip() if isinstance(val, str) else val)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for line in content.strip().splitlines():
+        ws.append([val.strip() for val in line.split("\t")])
     wb.save(str(file_path))
     return f"Successfully wrote Excel to {file_path}"
 
 
+def _list_dir(dir_path: Path) -> list[str]:
+    """Directory listing lines for FileTool's list action."""
+    with os.scandir(dir_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    return [("\U0001f4c1 " if e.is_dir() else "\U0001f4c4 ") + e.name for e in entries]
+
+
+def _subdir_names(dir_path: Path) -> list[str]:
+    """Sorted names of the subdirectories of *dir_path*."""
+    with os.scandir(dir_path) as it:
+        return sorted(e.name for e in it if e.is_dir())
+
+
+def _collect_files(scan_dirs: list[Path], allowed_dir: Path | None) -> list[Path]:
+    """Resolved paths of every file under *scan_dirs* that lies inside *allowed_dir*."""
+    files: list[Path] = []
+    for dir_path in scan_dirs:
+        for p in dir_path.rglob("*"):
+            if p.is_file():
+                try:
+                    resolved = p.resolve()
+                    if allowed_dir and not resolved.is_relative_to(allowed_dir):
+                        continue
+                    files.append(resolved)
+                except (PermissionError, OSError):
+                    continue
+    return files
+
+
+_MMAP_EDIT_MIN_BYTES = 1024 * 1024
+
+
+def _find_unique(buf: bytes | mmap.mmap, needle: bytes) -> tuple[int, int]:
+    """Return ``(first offset, occurrence count)`` of *needle* in *buf*."""
+    first = buf.find(needle)
+    if first == -1:
+        return -1, 0
+    count, pos = 1, buf.find(needle, first + len(needle))
+    while pos != -1:
+        count += 1
+        pos = buf.find(needle, pos + len(needle))
+    return first, count
+
+
+def _replace_once_bytes(file_path: Path, old_text: str, new_text: str) -> int:
+    """Replace a unique *old_text* in a UTF-8 file without decoding it.
+
+    Returns the number of occurrences found; the file is only rewritten when
+    there is exactly one. Files of ``_MMAP_EDIT_MIN_BYTES`` or more are
+    searched through mmap and rewritten via a temp file and ``os.replace``.
+    Returns 0 for files with ``\\r`` line endings so the caller can fall
+    back to the text path, which normalises newlines.
+    """
+    old_b = old_text.encode("utf-8")
+    if file_path.stat().st_size < _MMAP_EDIT_MIN_BYTES:
+        raw = file_path.read_bytes()
+        if b"\r" in raw:
+            return 0
+        first, count = _find_unique(raw, old_b)
+        if count == 1:
+            file_path.write_bytes(raw[:first] + new_text.encode("utf-8") + raw[first + len(old_b):])
+        return count
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm.find(b"\r") != -1:
+            return 0
+        first, count = _find_unique(mm, old_b)
+        if count != 1:
+            return count
+        fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as out, memoryview(mm) as view:
+                out.write(view[:first])
+                out.write(new_text.encode("utf-8"))
+                out.write(view[first + len(old_b):])
+            shutil.copymode(file_path, tmp)
+            os.replace(tmp, file_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return 1
+
+
 # ---------------------------------------------------------------------------
 # Path resolution (importable by other modules, e.g. message.py)
 # ---------------------------------------------------------------------------
@@ -140,12 +649,15 @@ def _resolve_path(
     workspace: Path | None = None,
     allowed_dir: Path | None = None,
 ) -> Path:
-    """Resolve *path_str* against *workspace* (when relative) and enforce *allowed_dir*."""
+    """Resolve *path_str* against *workspace* (when relative) and enforce *allowed_dir*.
+
+    *allowed_dir* must already be resolved; tools resolve it once on init.
+    """
     p = Path(path_str).expanduser()
     if not p.is_absolute() and workspace:
         p = workspace / p
     resolved = p.resolve()
-    if allowed_dir and not str(resolved).startswith(str(allowed_dir.resolve())):
+    if allowed_dir and not resolved.is_relative_to(allowed_dir):
         raise PermissionError(f"Path {path_str} is outside allowed directory {allowed_dir}")
     return resolved
 
@@ -159,7 +671,7 @@ class FileTool(Tool):
 
     def __init__(self, workspace: Path | None = None, allowed_dir: Path | None = None) -> None:
         self._workspace = workspace
-        self._allowed_dir = allowed_dir
+        self._allowed_dir = allowed_dir.resolve() if allowed_dir else None
 
     @property
     def name(self) -> str:
@@ -232,7 +744,10 @@ class FileTool(Tool):
             return f"Error: File not found: {path}"
         if not file_path.is_file():
             return f"Error: Not a file: {path}"
-        return _smart_read(file_path)
+        if file_path.suffix.lower() in _DOCUMENT_EXTS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_DOCUMENT_EXECUTOR, _smart_read, file_path)
+        return await asyncio.to_thread(_smart_read, file_path, _MAX_TEXT_BYTES)
 
     async def _write(self, path: str = "", content: str = "", **_: Any) -> str:
         if not path:
@@ -247,10 +762,10 @@ class FileTool(Tool):
         file_path.parent.mkdir(parents=True, exist_ok=True)
         ext = file_path.suffix.lower()
         if ext == ".docx":
-            return _write_docx(file_path, content)
+            return await asyncio.to_thread(_write_docx, file_path, content)
         if ext == ".xlsx":
-            return _write_xlsx(file_path, content)
-        file_path.write_text(content, encoding="utf-8")
+            return await asyncio.to_thread(_write_xlsx, file_path, content)
+        await asyncio.to_thread(file_path.write_text, content, encoding="utf-8")
         return f"Successfully wrote {len(content)} bytes to {file_path}"
 
     async def _edit(self, path: str = "", old_text: str = "", new_text: str = "", **_: Any) -> str:
@@ -262,19 +777,28 @@ class FileTool(Tool):
         if not file_path.exists():
             return f"Error: File not found: {path}"
 
-        content = file_path.read_text(encoding="utf-8")
-        if old_text not in content:
-            return self._not_found_message(old_text, content, path)
-
-        count = content.count(old_text)
+        count = await asyncio.to_thread(_replace_once_bytes, file_path, old_text, new_text)
+        if count == 1:
+            return f"Successfully edited {file_path}"
         if count > 1:
             return (
                 f"Warning: old_text appears {count} times. "
                 "Please provide more context to make it unique."
             )
 
-        new_content = content.replace(old_text, new_text, 1)
-        file_path.write_text(new_content, encoding="utf-8")
+        content = await asyncio.to_thread(file_path.read_text, encoding="utf-8")
+        start = content.find(old_text)
+        if start == -1:
+            return self._not_found_message(old_text, content, path)
+        end = start + len(old_text)
+        if content.find(old_text, end) != -1:
+            return (
+                f"Warning: old_text appears {content.count(old_text)} times. "
+                "Please provide more context to make it unique."
+            )
+
+        new_content = content[:start] + new_text + content[end:]
+        await asyncio.to_thread(file_path.write_text, new_content, encoding="utf-8")
         return f"Successfully edited {file_path}"
 
     async def _list(self, path: str = "", **_: Any) -> str:
@@ -286,10 +810,7 @@ class FileTool(Tool):
         if not dir_path.is_dir():
             return f"Error: Not a directory: {path}"
 
-        items: list[str] = []
-        for item in sorted(dir_path.iterdir()):
-            prefix = "\U0001f4c1 " if item.is_dir() else "\U0001f4c4 "
-            items.append(f"{prefix}{item.name}")
+        items = await asyncio.to_thread(_list_dir, dir_path)
         return "\n".join(items) if items else f"Directory {path} is empty"
 
     async def _move(self, path: str = "", destination: str = "", **_: Any) -> str:
@@ -306,7 +827,7 @@ class FileTool(Tool):
         if dst.is_dir():
             dst = dst / src.name
         dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(src), str(dst))
+        await asyncio.to_thread(shutil.move, str(src), str(dst))
         return f"Moved {src} \u2192 {dst}"
 
     @staticmethod
@@ -315,12 +836,31 @@ class FileTool(Tool):
         old_lines = old_text.splitlines(keepends=True)
         window = len(old_lines)
 
-        best_ratio, best_start = 0.0, 0
+        # SequenceMatcher compares whole lines, so a window can match at most
+        # as many lines as it shares with old_text. Count shared lines per
+        # offset with a rolling sum and only score offsets whose upper bound
+        # on the ratio can still beat the best match so far.
+        old_set = set(old_lines)
+        hits = [line in old_set for line in lines]
+        shared = sum(hits[:window])
+        candidates: list[tuple[int, int]] = []
         for i in range(max(1, len(lines) - window + 1)):
-            ratio = difflib.SequenceMatcher(
-                None, old_lines, lines[i : i + window],
-            ).ratio()
-            if ratio > best_ratio:
+            if i:
+                shared += hits[i + window - 1] - hits[i - 1]
+            if shared:
+                candidates.append((shared, i))
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+
+        matcher = difflib.SequenceMatcher(None, old_lines, autojunk=False)
+        best_ratio, best_start = 0.0, 0
+        for shared, i in candidates:
+            chunk = lines[i : i + window]
+            bound = 2.0 * shared / (window + len(chunk))
+            if bound <= 0.5 or bound < best_ratio:
+                break
+            matcher.set_seq2(chunk)
+            ratio = matcher.ratio()
+            if ratio > best_ratio or (ratio == best_ratio and i < best_start):
                 best_ratio, best_start = ratio, i
 
         if best_ratio > 0.5:
@@ -348,10 +888,12 @@ class ProjectTool(Tool):
         "\u0424\u043e\u0442\u043e",
         "\u041f\u0435\u0440\u0435\u043f\u0438\u0441\u043a\u0430",
     )
+    _TG_FILE_ID_RE = re.compile(r"^[A-Za-z]{2}[A-Za-z0-9]{10,}_\d+_")
 
     def __init__(self, workspace: Path | None = None, allowed_dir: Path | None = None) -> None:
         self._workspace = workspace
-        self._allowed_dir = allowed_dir
+        self._allowed_dir = allowed_dir.resolve() if allowed_dir else None
+        self._projects_root = workspace / "projects" if workspace else None
 
     @property
     def name(self) -> str:
@@ -412,9 +954,9 @@ class ProjectTool(Tool):
 
     @property
     def _projects_dir(self) -> Path:
-        if not self._workspace:
+        if self._projects_root is None:
             raise RuntimeError("workspace is not configured")
-        return self._workspace / "projects"
+        return self._projects_root
 
     async def _create(self, name: str = "", **_: Any) -> str:
         if not name:
@@ -436,7 +978,7 @@ class ProjectTool(Tool):
         projects_dir = self._projects_dir
         if not projects_dir.exists():
             return "No projects directory found."
-        dirs = sorted(p.name for p in projects_dir.iterdir() if p.is_dir())
+        dirs = await asyncio.to_thread(_subdir_names, projects_dir)
         if not dirs:
             return "No projects found."
         lines = [f"\U0001f4c1 {d}" for d in dirs]
@@ -467,7 +1009,7 @@ class ProjectTool(Tool):
         target = project_dir / folder_name
         if not target.exists():
             return f"Error: Folder '{folder_name}' not found in project '{name}'"
-        shutil.rmtree(target)
+        await asyncio.to_thread(shutil.rmtree, target)
         return f"Deleted folder '{folder_name}' from project '{name}'"
 
     async def _delete_project(self, name: str = "", **_: Any) -> str:
@@ -479,14 +1021,13 @@ class ProjectTool(Tool):
             return f"Error: Project '{name}' not found"
         if not project_dir.is_dir():
             return f"Error: '{name}' is not a project directory"
-        shutil.rmtree(project_dir)
+        await asyncio.to_thread(shutil.rmtree, project_dir)
         return f"Project '{name}' deleted."
 
     @staticmethod
     def _clean_telegram_filename(name: str) -> str:
         """Strip Telegram file_id prefix like 'BQACAgIAAxkBAAIC_05_' from filename."""
-        import re
-        cleaned = re.sub(r'^[A-Za-z]{2}[A-Za-z0-9]{10,}_\d+_', '', name)
+        cleaned = ProjectTool._TG_FILE_ID_RE.sub("", name, count=1)
         return cleaned if cleaned and cleaned != name else name
 
     async def _move_file(self, name: str = "", folder_name: str = "", file_path: str = "", **_: Any) -> str:
@@ -502,7 +1043,10 @@ class ProjectTool(Tool):
             )
         project_dir = self._projects_dir / name
         if not project_dir.exists():
-            available = sorted(p.name for p in self._projects_dir.iterdir() if p.is_dir()) if self._projects_dir.exists() else []
+            projects_dir = self._projects_dir
+            available = (
+                await asyncio.to_thread(_subdir_names, projects_dir) if projects_dir.exists() else []
+            )
             hint = f" Доступные проекты: {', '.join(available)}" if available else ""
             return f"Error: Project '{name}' not found.{hint}"
 
@@ -512,7 +1056,7 @@ class ProjectTool(Tool):
         if not src.is_file():
             return f"Error: Not a file: {file_path}"
 
-        subfolders = sorted(d.name for d in project_dir.iterdir() if d.is_dir())
+        subfolders = await asyncio.to_thread(_subdir_names, project_dir)
 
         if folder_name:
             target_dir = project_dir / folder_name
@@ -530,7 +1074,7 @@ class ProjectTool(Tool):
 
         clean_name = self._clean_telegram_filename(src.name)
         dst = target_dir / clean_name
-        shutil.move(str(src), str(dst))
+        await asyncio.to_thread(shutil.move, str(src), str(dst))
         return f"Файл '{clean_name}' перемещён в проект '{name}/{folder_name}'" if folder_name else f"Файл '{clean_name}' перемещён в проект '{name}'"
 
     async def _send_files(self, name: str = "", folder_name: str = "", **_: Any) -> str:
@@ -543,34 +1087,25 @@ class ProjectTool(Tool):
             )
         project_dir = self._projects_dir / name
         if not project_dir.exists():
-            available = sorted(p.name for p in self._projects_dir.iterdir() if p.is_dir()) if self._projects_dir.exists() else []
+            projects_dir = self._projects_dir
+            available = (
+                await asyncio.to_thread(_subdir_names, projects_dir) if projects_dir.exists() else []
+            )
             hint = f" Доступные проекты: {', '.join(available)}" if available else ""
             return f"Error: Project '{name}' not found.{hint}"
 
         if folder_name:
             target_dir = project_dir / folder_name
             if not target_dir.exists():
-                subfolders = sorted(d.name for d in project_dir.iterdir() if d.is_dir())
+                subfolders = await asyncio.to_thread(_subdir_names, project_dir)
                 hint = f" Доступные подпапки: {', '.join(subfolders)}" if subfolders else ""
                 return f"Error: Folder '{folder_name}' not found in project '{name}'.{hint}"
             scan_dirs = [target_dir]
         else:
             scan_dirs = [project_dir]
-            for d in project_dir.iterdir():
-                if d.is_dir():
-                    scan_dirs.append(d)
-
-        files: list[Path] = []
-        for dir_path in scan_dirs:
-            for p in dir_path.rglob("*"):
-                if p.is_file():
-                    try:
-                        resolved = p.resolve()
-                        if self._allowed_dir and not str(resolved).startswith(str(self._allowed_dir.resolve())):
-                            continue
-                        files.append(resolved)
-                    except (PermissionError, OSError):
-                        continue
+            scan_dirs.extend(project_dir / d for d in await asyncio.to_thread(_subdir_names, project_dir))
+
+        files = await asyncio.to_thread(_collect_files, scan_dirs, self._allowed_dir)
 
         if not files:
             scope = f"{name}/{folder_name}" if folder_name else name
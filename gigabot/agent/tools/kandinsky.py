@@ -11,6 +11,9 @@ from loguru import logger
 
 from gigabot.agent.tools.base import Tool
 from gigabot.providers.gigachat_provider import GigaChatProvider
+from gigabot.utils.helpers import json_dumps
+
+_IMG_SRC_RE = re.compile(r'<img\s+src="([^"]+)"')
 
 
 class KandinskyTool(Tool):
@@ -61,8 +64,6 @@ class KandinskyTool(Tool):
         height: int | None = None,
         **kwargs: Any,
     ) -> str:
-        import json as _json
-
         from gigachat.models import Chat, Messages, MessagesRole
 
         size_hint = ""
@@ -82,11 +83,10 @@ class KandinskyTool(Tool):
             response = self._provider._client.chat(chat)
             content = response.choices[0].message.content or ""
 
-            match = re.search(r'<img\s+src="([^"]+)"', content)
+            match = _IMG_SRC_RE.search(content)
             if not match:
-                return _json.dumps(
+                return json_dumps(
                     {"result": f"Изображение не было сгенерировано. Ответ модели: {content[:200]}"},
-                    ensure_ascii=False,
                 )
 
             file_id = match.group(1)
@@ -97,13 +97,12 @@ class KandinskyTool(Tool):
             save_path.write_bytes(image_bytes)
 
             logger.info("Image generated and saved to {}", save_path)
-            return _json.dumps(
+            return json_dumps(
                 {"result": f"Изображение сохранено: {save_path}", "path": str(save_path)},
-                ensure_ascii=False,
             )
         except Exception as e:
             logger.error("Kandinsky image generation failed: {}", e)
-            return _json.dumps({"error": str(e)}, ensure_ascii=False)
+            return json_dumps({"error": str(e)})
 
     def _resolve_save_path(self, save_to: str | None) -> Path:
         if save_to:
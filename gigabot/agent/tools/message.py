@@ -1,5 +1,6 @@
 """Message tool for sending messages to users."""
 
+import asyncio
 from pathlib import Path
 from typing import Any, Awaitable, Callable
 
@@ -40,6 +41,14 @@ class MessageTool(Tool):
         """Reset per-turn send tracking."""
         self._sent_in_turn = False
 
+    def _resolve_media(self, media: list[str]) -> tuple[list[str], str | None]:
+        """Resolve attachment paths; also return the first one that is not a file."""
+        resolved = [_resolve_path(m, self._workspace, None) for m in media]
+        missing = next((p for p in resolved if not p.is_file()), None)
+        if missing is not None:
+            return [], str(missing)
+        return [str(p) for p in resolved], None
+
     @property
     def name(self) -> str:
         return "message"
@@ -100,13 +109,12 @@ class MessageTool(Tool):
         if not self._send_callback:
             return "Error: Message sending not configured"
 
-        media_raw = media or []
-        media_resolved = [str(_resolve_path(m, self._workspace, None)) for m in media_raw]
-
-        for m in media_resolved:
-            if not Path(m).is_file():
+        media_resolved: list[str] = []
+        if media:
+            media_resolved, missing = await asyncio.to_thread(self._resolve_media, media)
+            if missing:
                 return (
-                    f"Error: File '{m}' does not exist. "
+                    f"Error: File '{missing}' does not exist. "
                     "Create it first using the 'file' tool (action='write'), then call message again."
                 )
 
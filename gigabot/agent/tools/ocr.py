@@ -1,9 +1,61 @@
 """OCR tool — text recognition from images using Tesseract."""
 
+import asyncio
+import os
+import threading
 from pathlib import Path
 from typing import Any
 
 from gigabot.agent.tools.base import Tool
+from gigabot.agent.tools.filesystem import _optional_import
+
+# Tesseract's OpenMP threading scales poorly; single-threaded processes run
+# side by side (one per concurrent OCR call) make better use of the cores.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Roughly an A4 page scanned at 300 dpi; taller images only slow Tesseract
+# down without helping recognition.
+_OCR_MAX_HEIGHT = 3500
+
+
+def _prepare_image(path: Path) -> Any:
+    """Load an image as grayscale with stretched contrast, capped in height."""
+    pil_image = _optional_import("PIL.Image")
+    pil_ops = _optional_import("PIL.ImageOps")
+
+    with pil_image.open(path) as src:
+        if "A" in src.getbands() or "transparency" in src.info:
+            # Transparent pixels are usually black underneath; put them on
+            # white so dark text on a clear background stays readable.
+            rgba = src.convert("RGBA")
+            white = pil_image.new("RGBA", rgba.size, (255, 255, 255, 255))
+            image = pil_image.alpha_composite(white, rgba).convert("L")
+        else:
+            image = src.convert("L")
+    if image.height > _OCR_MAX_HEIGHT:
+        image.thumbnail((image.width, _OCR_MAX_HEIGHT), pil_image.Resampling.LANCZOS)
+    return pil_ops.autocontrast(image)
+
+
+# Idle tesserocr engines per language. An engine is not thread-safe, so each
+# call takes one out (creating it if none is free) and puts it back after.
+_TESS_APIS: dict[str, list[Any]] = {}
+_TESS_APIS_LOCK = threading.Lock()
+
+
+def _ocr_in_process(tesserocr: Any, image: Any, lang: str) -> str:
+    """Recognise *image* with a pooled tesserocr engine (no subprocess)."""
+    with _TESS_APIS_LOCK:
+        idle = _TESS_APIS.setdefault(lang, [])
+        api = idle.pop() if idle else None
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang=lang)
+    try:
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    finally:
+        with _TESS_APIS_LOCK:
+            idle.append(api)
 
 
 class OCRTool(Tool):
@@ -35,18 +87,15 @@ class OCRTool(Tool):
         }
 
     async def execute(self, file_path: str, lang: str = "rus+eng", **kwargs: Any) -> str:
-        try:
-            import pytesseract
-        except ImportError:
+        pytesseract = _optional_import("pytesseract")
+        if pytesseract is None:
             return (
                 "Ошибка: pytesseract не установлен. "
                 "Установите: pip install pytesseract  "
                 "и убедитесь, что Tesseract OCR доступен в PATH."
             )
 
-        try:
-            from PIL import Image
-        except ImportError:
+        if _optional_import("PIL.Image") is None:
             return "Ошибка: Pillow не установлен. Установите: pip install Pillow"
 
         p = Path(file_path).expanduser()
@@ -56,8 +105,20 @@ class OCRTool(Tool):
             return f"Ошибка: не является файлом: {file_path}"
 
         try:
-            image = Image.open(p)
-            text = pytesseract.image_to_string(image, lang=lang)
+            image = await asyncio.to_thread(_prepare_image, p)
+            # tesserocr keeps the models loaded between calls; pytesseract
+            # starts a tesseract process and re-encodes the image every time.
+            # Its bundled engine may not find tessdata that the tesseract
+            # binary does, so a failed init falls back to pytesseract.
+            text = None
+            tesserocr = _optional_import("tesserocr")
+            if tesserocr is not None:
+                try:
+                    text = await asyncio.to_thread(_ocr_in_process, tesserocr, image, lang)
+                except RuntimeError:
+                    pass
+            if text is None:
+                text = await asyncio.to_thread(pytesseract.image_to_string, image, lang=lang)
             text = text.strip()
             if not text:
                 return "Текст на изображении не обнаружен."
@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import importlib
+import importlib.util
+import math
+import operator
 import os
 import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
 from gigabot.agent.tools.base import Tool
-from gigabot.agent.tools.filesystem import _smart_read
+from gigabot.agent.tools.filesystem import _iter_pdf_text, _pdf_backend, _smart_read
 from gigabot.config.schema import RAGConfig
 
 _SUPPORTED_EXTENSIONS = {".txt", ".pdf", ".docx", ".doc", ".xlsx", ".xls"}
@@ -22,26 +36,52 @@ _CYRILLIC_TO_LATIN = {
     "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
     "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
 }
+_TRANSLIT_TABLE = str.maketrans(_CYRILLIC_TO_LATIN)
+# Everything else that is not ASCII alphanumeric collapses into one "_".
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Index settings for new collections. Upserts first land in a brute-force
+# buffer and are added to the HNSW graph in batches of ``batch_size``; the
+# graph is flushed to disk every ``sync_threshold`` records. Raising both
+# from Chroma's defaults (100 / 1000) means far fewer graph updates and
+# flushes while a folder is indexed. Existing collections keep their settings.
+_HNSW_PARAMS = {
+    "hnsw:space": "cosine",
+    "hnsw:batch_size": 1000,
+    "hnsw:sync_threshold": 10000,
+}
+
+# Tooling and dependency trees that never hold project documents.
+_SKIP_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", ".venv", "venv", "__pycache__"})
+
 
+def _find_indexable_files(folder: Path) -> list[Path]:
+    """Return supported files under *folder*, sorted, skipping _SKIP_DIRS.
 
+    The suffix is checked on the bare name before any Path is built, and
+    pruned directories are never listed at all.
+    """
+    found: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in _SUPPORTED_EXTENSIONS:
+                path = Path(dirpath, name)
+                if path.is_file():
+                    found.append(path)
+    found.sort()
+    return found
+
+
+@functools.lru_cache(maxsize=512)
 def _normalize_collection_name(name: str) -> str:
     """Convert arbitrary project name to ChromaDB-compatible collection name.
 
     ChromaDB requires: 3-63 chars, alphanumeric start/end,
     only alphanumeric/underscore/hyphen inside.
     """
-    lowered = name.lower().strip()
-    result: list[str] = []
-    for ch in lowered:
-        if ch in _CYRILLIC_TO_LATIN:
-            result.append(_CYRILLIC_TO_LATIN[ch])
-        elif ch.isascii() and ch.isalnum():
-            result.append(ch)
-        elif ch in (" ", "_", "-", "."):
-            result.append("_")
-        else:
-            result.append("_")
-    normalized = re.sub(r"_+", "_", "".join(result)).strip("_")
+    transliterated = name.lower().strip().translate(_TRANSLIT_TABLE)
+    normalized = _NON_ALNUM_RE.sub("_", transliterated).strip("_")
     if len(normalized) < 3:
         normalized = normalized.ljust(3, "x")
     if len(normalized) > 63:
@@ -49,6 +89,79 @@ def _normalize_collection_name(name: str) -> str:
     return normalized
 
 
+class _EmbeddingCache:
+    """Embedding vectors stored on disk, keyed by model and exact input text.
+
+    Re-indexing a folder re-embeds every chunk; with this cache only new or
+    changed chunks reach the provider. Vectors are kept as float32, which is
+    what Chroma stores and compares anyway.
+    """
+
+    # Stay well under SQLite's limit on host parameters per statement.
+    _LOOKUP_BATCH = 500
+    # Bumped whenever the key or vector encoding changes; older rows are dropped.
+    _SCHEMA_VERSION = 2
+    # Roughly 200 MB of 1024-dim vectors; the least recently used go first.
+    _MAX_ROWS = 50_000
+    # Vectors nobody asked for in this long are dropped regardless of count.
+    _MAX_AGE = 90 * 24 * 3600
+
+    def __init__(self, path: Path) -> None:
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version != self._SCHEMA_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS embeddings")
+            self._db.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key BLOB PRIMARY KEY, vec BLOB NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        return hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=16).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, array]:
+        found: dict[bytes, array] = {}
+        now = time.time()
+        with self._lock, self._db:
+            for i in range(0, len(keys), self._LOOKUP_BATCH):
+                batch = keys[i : i + self._LOOKUP_BATCH]
+                marks = ", ".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", batch,
+                )
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec
+                self._db.execute(
+                    f"UPDATE embeddings SET used = ? WHERE key IN ({marks})", [now, *batch],
+                )
+        return found
+
+    def put_many(self, items: list[tuple[bytes, array]]) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec, used) VALUES (?, ?, ?)",
+                [(key, vec.tobytes(), now) for key, vec in items],
+            )
+            self._db.execute("DELETE FROM embeddings WHERE used < ?", (now - self._MAX_AGE,))
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self._MAX_ROWS,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
 class RAGTool(Tool):
     """RAG: создание проектов базы знаний, индексация файлов, поиск по документам."""
 
@@ -58,20 +171,40 @@ class RAGTool(Tool):
         rag_config: RAGConfig,
         workspace: Path | None = None,
     ) -> None:
-        import chromadb
+        # chromadb takes seconds to import, so it is loaded on a background
+        # thread; still fail here when it is missing so the tool is not
+        # registered. A broken install (old sqlite3, numpy/pydantic mismatch)
+        # only shows up on import and is reported through import_error.
+        if importlib.util.find_spec("chromadb") is None:
+            raise ImportError("chromadb is not installed")
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gigabot-chromadb")
+        self._chromadb: Future[Any] = pool.submit(importlib.import_module, "chromadb")
+        pool.shutdown(wait=False)
 
         self._provider = provider
         self._config = rag_config
         self._workspace = Path(workspace or "~/.gigabot/workspace").expanduser().resolve()
 
-        chroma_dir = str(Path(rag_config.chroma_dir).expanduser())
-        os.makedirs(chroma_dir, exist_ok=True)
-        self._client = chromadb.PersistentClient(path=chroma_dir)
+        self._chroma_dir = str(Path(rag_config.chroma_dir).expanduser())
+        os.makedirs(self._chroma_dir, exist_ok=True)
+        self._embed_cache = _EmbeddingCache(Path(self._chroma_dir) / "embed_cache.sqlite")
 
         self._embed_model = rag_config.embed_model
         self._chunk_size = rag_config.chunk_size
         self._chunk_overlap = rag_config.chunk_overlap
         self._top_k = rag_config.top_k
+        self._query_embeddings: OrderedDict[str, list[float]] = OrderedDict()
+        # Per collection: (unit query vector, top_k, raw hits, monotonic time).
+        self._search_cache: dict[str, deque[tuple[Any, int, tuple[list, list, list], float]]] = {}
+
+    @property
+    def import_error(self) -> BaseException | None:
+        """Why chromadb failed to import, once the background import is done."""
+        return self._chromadb.exception() if self._chromadb.done() else None
+
+    @functools.cached_property
+    def _client(self) -> Any:
+        return self._chromadb.result().PersistentClient(path=self._chroma_dir)
 
     # ------------------------------------------------------------------
     # Tool interface
@@ -162,6 +295,11 @@ class RAGTool(Tool):
             return raw
         return [c.name for c in raw]
 
+    def _list_collections(self) -> list[Any]:
+        """Get collection objects — v0.5 already returns them, v0.6+ only names."""
+        raw = self._client.list_collections()
+        return [self._client.get_collection(c) if isinstance(c, str) else c for c in raw]
+
     def _resolve_project_dir(self, project: str) -> Path | None:
         """Resolve project name to actual project directory under workspace/projects.
         Handles both exact name (e.g. 'Коттедж на Горной') and normalized name (e.g. 'Kottedzh_na_Gornoy').
@@ -182,44 +320,188 @@ class RAGTool(Tool):
         col_name = _normalize_collection_name(project)
         return self._client.get_or_create_collection(
             name=col_name,
-            metadata={"hnsw:space": "cosine", "display_name": project},
+            metadata={**_HNSW_PARAMS, "display_name": project},
         )
 
     @staticmethod
-    def _chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
-        if not text or not text.strip():
-            return []
-        chunks: list[str] = []
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            if end >= len(text):
-                break
-            start += chunk_size - chunk_overlap
-        return chunks
+    def _iter_chunks(pieces: Iterable[str], chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+        """Split streamed text into overlapping, stripped chunks.
+
+        The output is the same as chunking the joined pieces, but only the
+        unfinished tail of the text is ever buffered.
+        """
+        step = chunk_size - chunk_overlap
+        buf = ""
+        for piece in pieces:
+            buf = buf + piece if buf else piece
+            if len(buf) <= chunk_size:
+                continue
+            # Every window that ends before the buffer does cannot be the last.
+            stop = ((len(buf) - chunk_size - 1) // step + 1) * step
+            for start in range(0, stop, step):
+                chunk = buf[start:start + chunk_size].strip()
+                if chunk:
+                    yield chunk
+            buf = buf[stop:]
+        chunk = buf.strip()
+        if chunk:
+            yield chunk
 
     @staticmethod
-    def _read_file(file_path: str) -> str:
+    def _iter_file_text(file_path: str) -> Iterator[str]:
+        """Yield a file's text in pieces: PDFs page by page, other formats whole."""
         p = Path(file_path).expanduser().resolve()
         if not p.exists():
             raise FileNotFoundError(f"Файл не найден: {file_path}")
         if not p.is_file():
             raise ValueError(f"Не является файлом: {file_path}")
-        return _smart_read(p)
+        if p.suffix.lower() == ".pdf" and _pdf_backend() is not None:
+            try:
+                yield from _iter_pdf_text(p)
+            except Exception as e:
+                raise ValueError(f"Ошибка чтения файла: Error reading PDF: {e}") from e
+            return
+        text = _smart_read(p)
+        if text.startswith("Error"):
+            raise ValueError(f"Ошибка чтения файла: {text}")
+        yield text
+
+    def _prepare_chunks(self, file_path: str) -> list[str]:
+        """Read a file and split it into chunks ready for embedding.
+
+        PDFs are chunked page by page as they are extracted, so a large
+        document is never held as one string next to its chunks.
+        """
+        pieces = self._iter_file_text(file_path)
+        return list(self._iter_chunks(pieces, self._chunk_size, self._chunk_overlap))
+
+    _UPSERT_BATCH_SIZE = 256
+
+    @staticmethod
+    def _upsert_chunks(
+        collection: Any,
+        files: list[tuple[str, list[str]]],
+        embeddings: list[array],
+    ) -> None:
+        """Store the chunks of one or more files in an already opened collection.
+
+        *files* pairs each source name with its chunks; *embeddings* covers all
+        of them in order. Chunk ids are ``<name>__chunk_<n>``, so when two files
+        share a name the later one wins, just as with one upsert per file.
+        Records go out in slices of ``_UPSERT_BATCH_SIZE`` across file
+        boundaries, so a folder of small files needs only a few Chroma calls.
+        """
+        records: dict[str, tuple[array, str, dict[str, Any]]] = {}
+        vectors = iter(embeddings)
+        for source_name, chunks in files:
+            for i, chunk in enumerate(chunks):
+                meta = {"source": source_name, "chunk_index": i}
+                records[f"{source_name}__chunk_{i}"] = (next(vectors), chunk, meta)
+
+        items = list(records.items())
+        step = RAGTool._UPSERT_BATCH_SIZE
+        for start in range(0, len(items), step):
+            batch = items[start:start + step]
+            collection.upsert(
+                ids=[chunk_id for chunk_id, _ in batch],
+                embeddings=[vec.tolist() for _, (vec, _, _) in batch],
+                documents=[doc for _, (_, doc, _) in batch],
+                metadatas=[meta for _, (_, _, meta) in batch],
+            )
 
     _MAX_EMBED_CHARS = 6000
     _EMBED_BATCH_SIZE = 5
+    _EMBED_CONCURRENCY = 4
+
+    async def _embed_texts(self, texts: list[str]) -> list[array]:
+        """Embed *texts* in order, as float32 arrays.
 
-    def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        Chroma keeps float32 anyway, and a folder's worth of vectors held as
+        Python float lists would take about eight times the memory; they are
+        expanded back to lists only per upsert slice.
+        """
         safe = [t[:self._MAX_EMBED_CHARS] if len(t) > self._MAX_EMBED_CHARS else t for t in texts]
-        all_embeddings: list[list[float]] = []
-        for i in range(0, len(safe), self._EMBED_BATCH_SIZE):
-            batch = safe[i : i + self._EMBED_BATCH_SIZE]
-            all_embeddings.extend(self._provider.get_embeddings(batch, model=self._embed_model))
-        return all_embeddings
+        keys = [_EmbeddingCache.key(self._embed_model, t) for t in safe]
+        known = await asyncio.to_thread(self._embed_cache.get_many, keys)
+
+        # Only texts missing from the cache go to the provider, each once.
+        pending = {k: t for k, t in zip(keys, safe) if k not in known}
+        if pending:
+            missing_keys = list(pending)
+            missing_texts = list(pending.values())
+            # The provider client is blocking; a few batches are in flight at
+            # once on worker threads so their round-trips overlap.
+            sem = asyncio.Semaphore(self._EMBED_CONCURRENCY)
+
+            async def embed(batch: list[str]) -> list[list[float]]:
+                async with sem:
+                    return await asyncio.to_thread(
+                        self._provider.get_embeddings, batch, model=self._embed_model,
+                    )
+
+            step = self._EMBED_BATCH_SIZE
+            results = await asyncio.gather(
+                *(embed(missing_texts[i : i + step]) for i in range(0, len(missing_texts), step))
+            )
+            fresh = [
+                (key, array("f", e))
+                for key, e in zip(missing_keys, (e for batch in results for e in batch))
+            ]
+            await asyncio.to_thread(self._embed_cache.put_many, fresh)
+            known.update(fresh)
+        return [known[k] for k in keys]
+
+    _QUERY_CACHE_SIZE = 256
+
+    async def _embed_query(self, query: str) -> list[float]:
+        """Embed a search query, reusing the vector for recently seen queries."""
+        cache = self._query_embeddings
+        embedding = cache.get(query)
+        if embedding is not None:
+            cache.move_to_end(query)
+            return embedding
+        # One-off queries would only bloat the on-disk cache, so they go
+        # straight to the provider and are remembered in memory only.
+        safe = query[:self._MAX_EMBED_CHARS]
+        (embedding,) = await asyncio.to_thread(
+            self._provider.get_embeddings, [safe], model=self._embed_model,
+        )
+        cache[query] = embedding
+        if len(cache) > self._QUERY_CACHE_SIZE:
+            cache.popitem(last=False)
+        return embedding
+
+    _SEARCH_CACHE_SIZE = 128
+    _SEARCH_CACHE_TTL = 600.0
+    _SEARCH_CACHE_MIN_SIMILARITY = 0.97
+
+    def _cached_hits(self, col_name: str, query_vec: Any, top_k: int) -> tuple[list, list, list] | None:
+        """Hits of a recent search whose query is nearly the same as this one.
+
+        Rephrasings like "найди X" and "найди пожалуйста X" embed almost
+        identically, so the earlier Chroma result is reused when the cosine
+        similarity of the two queries is at least _SEARCH_CACHE_MIN_SIMILARITY.
+        """
+        entries = self._search_cache.get(col_name)
+        if not entries:
+            return None
+        now = time.monotonic()
+        live = [e for e in entries if e[1] == top_k and now - e[3] < self._SEARCH_CACHE_TTL]
+        if not live:
+            return None
+        sim, hits = max(
+            ((sum(map(operator.mul, e[0], query_vec)), e[2]) for e in live),
+            key=operator.itemgetter(0),
+        )
+        return hits if sim >= self._SEARCH_CACHE_MIN_SIMILARITY else None
+
+    def _forget_searches(self, col_name: str) -> None:
+        """Drop cached search hits once a collection's contents change."""
+        self._search_cache.pop(col_name, None)
+
+    def close(self) -> None:
+        """Close the on-disk embedding cache."""
+        self._embed_cache.close()
 
     # ------------------------------------------------------------------
     # Actions
@@ -237,7 +519,7 @@ class RAGTool(Tool):
 
         self._client.create_collection(
             name=col_name,
-            metadata={"hnsw:space": "cosine", "display_name": project},
+            metadata={**_HNSW_PARAMS, "display_name": project},
         )
         return f"Проект '{project}' успешно создан."
 
@@ -248,20 +530,22 @@ class RAGTool(Tool):
         col_name = _normalize_collection_name(project)
         try:
             self._client.delete_collection(name=col_name)
+            self._forget_searches(col_name)
             return f"Проект '{project}' удалён."
         except ValueError:
             return f"Ошибка: проект '{project}' не найден."
 
     async def _list_projects(self, **kwargs: Any) -> str:
-        names = self._list_collection_names()
-        if not names:
+        collections = await asyncio.to_thread(self._list_collections)
+        if not collections:
             return "Нет созданных проектов базы знаний."
-        lines: list[str] = []
-        for name in names:
-            c = self._client.get_collection(name)
-            display = (c.metadata or {}).get("display_name", name)
-            lines.append(f"  • {display} ({c.count()} документов)")
-        return f"Проекты ({len(names)}):\n" + "\n".join(lines)
+        # Each count is a separate SQLite query; run them side by side.
+        counts = await asyncio.gather(*(asyncio.to_thread(c.count) for c in collections))
+        lines = [
+            f"  • {(c.metadata or {}).get('display_name', c.name)} ({n} документов)"
+            for c, n in zip(collections, counts)
+        ]
+        return f"Проекты ({len(collections)}):\n" + "\n".join(lines)
 
     async def _index_file(self, **kwargs: Any) -> str:
         project = kwargs.get("project")
@@ -271,27 +555,16 @@ class RAGTool(Tool):
         if not file_path:
             return "Ошибка: не указан путь к файлу. Пример: knowledge(action='index_file', project='мой_проект', file_path='docs/file.pdf')"
 
-        text = self._read_file(file_path)
-        if text.startswith("Error"):
-            return f"Ошибка чтения файла: {text}"
-
-        chunks = self._chunk_text(text, self._chunk_size, self._chunk_overlap)
+        chunks = await asyncio.to_thread(self._prepare_chunks, file_path)
         if not chunks:
             return f"Файл '{file_path}' не содержит текста для индексации."
 
-        embeddings = self._embed_texts(chunks)
+        embeddings = await self._embed_texts(chunks)
         collection = self._get_or_create_collection(project)
 
         source_name = Path(file_path).name
-        ids = [f"{source_name}__chunk_{i}" for i in range(len(chunks))]
-        metadatas = [{"source": source_name, "chunk_index": i} for i in range(len(chunks))]
-
-        collection.upsert(
-            ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
-        )
+        self._upsert_chunks(collection, [(source_name, chunks)], embeddings)
+        self._forget_searches(collection.name)
 
         return (
             f"Файл '{source_name}' проиндексирован в проект '{project}': "
@@ -324,33 +597,45 @@ class RAGTool(Tool):
         if not folder.is_dir():
             return f"Ошибка: не является папкой: {folder_path}"
 
-        files = [
-            f for f in folder.rglob("*")
-            if f.is_file() and f.suffix.lower() in _SUPPORTED_EXTENSIONS
-        ]
+        files = await asyncio.to_thread(_find_indexable_files, folder)
 
         if not files:
             return f"В папке '{folder_path}' не найдено поддерживаемых файлов ({', '.join(_SUPPORTED_EXTENSIONS)})."
 
-        indexed = 0
-        errors: list[str] = []
-        total_chunks = 0
+        # Read every file first so the embedding batches span file boundaries:
+        # a folder of small files then costs a handful of provider calls
+        # instead of at least one per file.
+        # Parsing runs in worker threads, a few files at a time; the Chroma
+        # upserts below stay on the event loop.
+        sem = asyncio.Semaphore(os.cpu_count() or 1)
 
-        for file in sorted(files):
-            result = await self._index_file(
-                action="index_file",
-                project=project,
-                file_path=str(file),
-            )
-            if result.startswith("Ошибка") or result.startswith("Файл") and "не содержит" in result:
-                errors.append(f"  • {file.name}: {result}")
-            else:
-                indexed += 1
-                try:
-                    count = int(result.split(": ")[1].split(" ")[0])
-                    total_chunks += count
-                except (IndexError, ValueError):
-                    pass
+        async def prepare(file: Path) -> list[str]:
+            async with sem:
+                return await asyncio.to_thread(self._prepare_chunks, str(file))
+
+        results = await asyncio.gather(*(prepare(f) for f in files), return_exceptions=True)
+
+        prepared: list[tuple[str, list[str]]] = []
+        errors: list[str] = []
+        for file, chunks in zip(files, results):
+            if isinstance(chunks, BaseException):
+                errors.append(f"  • {file.name}: {chunks}")
+                continue
+            if not chunks:
+                errors.append(f"  • {file.name}: Файл '{file}' не содержит текста для индексации.")
+                continue
+            prepared.append((file.name, chunks))
+
+        all_chunks = [chunk for _, chunks in prepared for chunk in chunks]
+        if all_chunks:
+            embeddings = await self._embed_texts(all_chunks)
+            # Opened once for the whole folder rather than once per file.
+            collection = self._get_or_create_collection(project)
+            self._upsert_chunks(collection, prepared, embeddings)
+            self._forget_searches(collection.name)
+
+        indexed = len(prepared)
+        total_chunks = len(all_chunks)
 
         summary = f"Индексация папки '{folder_path}' в проект '{project}' завершена.\n"
         summary += f"Файлов обработано: {indexed}/{len(files)}, фрагментов: {total_chunks}."
@@ -379,27 +664,36 @@ class RAGTool(Tool):
             return f"Проект '{display}' пуст — сначала проиндексируйте файлы."
 
         top_k = min(top_k, collection.count())
-        query_embedding = self._embed_texts([query])[0]
-
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"],
-        )
-
-        documents = results.get("documents", [[]])[0]
-        metadatas = results.get("metadatas", [[]])[0]
-        distances = results.get("distances", [[]])[0]
+        query_embedding = await self._embed_query(query)
+        norm = math.hypot(*query_embedding)
+        query_vec = array("f", [x / norm for x in query_embedding]) if norm else None
+
+        hits = self._cached_hits(col_name, query_vec, top_k) if query_vec is not None else None
+        if hits is None:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+            hits = (
+                results.get("documents", [[]])[0],
+                results.get("metadatas", [[]])[0],
+                results.get("distances", [[]])[0],
+            )
+            if query_vec is not None:
+                entries = self._search_cache.setdefault(
+                    col_name, deque(maxlen=self._SEARCH_CACHE_SIZE),
+                )
+                entries.append((query_vec, top_k, hits, time.monotonic()))
+        documents, metadatas, distances = hits
 
         if not documents:
             return f"По запросу '{query}' ничего не найдено в проекте '{display}'."
 
-        parts: list[str] = [f"Результаты поиска в '{display}' по запросу: «{query}» (топ-{len(documents)}):\n"]
-        for i, (doc, meta, dist) in enumerate(zip(documents, metadatas, distances), 1):
-            source = meta.get("source", "?") if meta else "?"
-            score = 1 - dist
-            parts.append(f"--- Результат {i} (релевантность: {score:.2f}, источник: {source}) ---")
-            parts.append(doc.strip())
-            parts.append("")
-
-        return "\n".join(parts)
+        header = f"Результаты поиска в '{display}' по запросу: «{query}» (топ-{len(documents)}):\n"
+        results = [
+            f"--- Результат {i} (релевантность: {1 - dist:.2f}, "
+            f"источник: {(meta or {}).get('source', '?')}) ---\n{doc.strip()}\n"
+            for i, (doc, meta, dist) in enumerate(zip(documents, metadatas, distances), 1)
+        ]
+        return "\n".join([header, *results])
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import time
 import uuid
 from pathlib import Path
@@ -17,6 +19,9 @@ from gigabot.config.schema import SaluteSpeechConfig
 SALUTE_OAUTH_URL = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
 SALUTE_TTS_URL = "https://smartspeech.sber.ru/rest/v1/text:synthesize"
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); without it stay on 1.1.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
 
 class _TokenCache:
     """Reusable OAuth token with expiry tracking."""
@@ -41,6 +46,8 @@ class SaluteSpeechTool(Tool):
         self._config = salute_speech_config
         self._workspace = workspace
         self._token_cache = _TokenCache()
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
 
     @property
     def name(self) -> str:
@@ -91,19 +98,18 @@ class SaluteSpeechTool(Tool):
         tts_voice = voice or self._config.tts_voice
 
         try:
-            async with httpx.AsyncClient(verify=False) as client:
-                resp = await client.post(
-                    SALUTE_TTS_URL,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/text",
-                    },
-                    params={"voice": tts_voice, "format": "wav16"},
-                    content=text.encode("utf-8"),
-                    timeout=60.0,
-                )
-                resp.raise_for_status()
-                audio_bytes = resp.content
+            resp = await (await self._http()).post(
+                SALUTE_TTS_URL,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/text",
+                },
+                params={"voice": tts_voice, "format": "wav16"},
+                content=text.encode("utf-8"),
+                timeout=60.0,
+            )
+            resp.raise_for_status()
+            audio_bytes = resp.content
         except httpx.HTTPStatusError as e:
             logger.error("SaluteSpeech TTS HTTP error: {} {}", e.response.status_code, e.response.text[:200])
             return f"Ошибка синтеза речи: HTTP {e.response.status_code}"
@@ -131,25 +137,24 @@ class SaluteSpeechTool(Tool):
             return self._token_cache.token
 
         try:
-            async with httpx.AsyncClient(verify=False) as client:
-                resp = await client.post(
-                    SALUTE_OAUTH_URL,
-                    headers={
-                        "Content-Type": "application/x-www-form-urlencoded",
-                        "Accept": "application/json",
-                        "RqUID": str(uuid.uuid4()),
-                        "Authorization": f"Basic {self._config.credentials}",
-                    },
-                    data={"scope": self._config.scope},
-                    timeout=15.0,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                self._token_cache.token = data["access_token"]
-                self._token_cache.expires_at = (
-                    time.time() + data.get("expires_in", 1800) - 60
-                )
-                return self._token_cache.token
+            resp = await (await self._http()).post(
+                SALUTE_OAUTH_URL,
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "Accept": "application/json",
+                    "RqUID": str(uuid.uuid4()),
+                    "Authorization": f"Basic {self._config.credentials}",
+                },
+                data={"scope": self._config.scope},
+                timeout=15.0,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            self._token_cache.token = data["access_token"]
+            self._token_cache.expires_at = (
+                time.time() + data.get("expires_in", 1800) - 60
+            )
+            return self._token_cache.token
         except Exception as e:
             logger.error("Failed to obtain SaluteSpeech token: {}", e)
             return None
@@ -158,6 +163,37 @@ class SaluteSpeechTool(Tool):
     # Helpers
     # ------------------------------------------------------------------
 
+    async def aclose(self) -> None:
+        """Close the shared HTTP client, if one was opened."""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is None:
+            return
+        try:
+            await client.aclose()
+        except Exception as e:
+            # A client left over from a finished event loop cannot shut its
+            # transports down cleanly; they die with that loop anyway.
+            logger.debug("SaluteSpeech client close failed: {}", e)
+
+    async def _http(self) -> httpx.AsyncClient:
+        """Shared client, so connections and TLS sessions outlive a single call.
+
+        A client is bound to the event loop it first ran on; a new loop (e.g.
+        a fresh ``asyncio.run`` in the CLI) closes the old client and gets a
+        new one.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop is not loop:
+            await self.aclose()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                verify=False,
+                http2=_HTTP2,
+                limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300),
+            )
+            self._client_loop = loop
+        return self._client
+
     def _resolve_save_path(self, save_to: str | None) -> Path:
         if save_to:
             p = Path(save_to).expanduser()
@@ -194,7 +194,7 @@ async def _transcribe_voice(
             )
             resp.raise_for_status()
             data = resp.json()
-            logger.debug("SaluteSpeech STT response: {}", str(data)[:500])
+            logger.opt(lazy=True).debug("SaluteSpeech STT response: {}", lambda: str(data)[:500])
             results = data.get("result", [])
             if results:
                 item = results[0]
@@ -437,6 +437,7 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            await agent.aclose()
 
     asyncio.run(run())
 
@@ -501,10 +502,13 @@ def agent(
 
     if message:
         async def run_once():
-            with _thinking_ctx():
-                response = await agent_loop.process_direct(
-                    message, session_id, on_progress=_cli_progress,
-                )
+            try:
+                with _thinking_ctx():
+                    response = await agent_loop.process_direct(
+                        message, session_id, on_progress=_cli_progress,
+                    )
+            finally:
+                await agent_loop.aclose()
             _print_agent_response(response, render_markdown=markdown)
 
         asyncio.run(run_once())
@@ -595,6 +599,7 @@ def agent(
                 agent_loop.stop()
                 outbound_task.cancel()
                 await asyncio.gather(bus_task, outbound_task, return_exceptions=True)
+                await agent_loop.aclose()
 
         asyncio.run(run_interactive())
 
@@ -910,7 +915,10 @@ def cron_run(
     service.on_job = on_job
 
     async def run():
-        return await service.run_job(job_id, force=force)
+        try:
+            return await service.run_job(job_id, force=force)
+        finally:
+            await agent_loop.aclose()
 
     if asyncio.run(run()):
         console.print("[green]✓[/green] Задача выполнена")
@@ -1,8 +1,14 @@
 """Utility functions for GigaBot."""
 
+import json
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def ensure_dir(path: Path) -> Path:
     path.mkdir(parents=True, exist_ok=True)
@@ -43,3 +49,17 @@ def parse_session_key(key: str) -> tuple[str, str]:
     if len(parts) != 2:
         raise ValueError(f"Invalid session key: {key}")
     return parts[0], parts[1]
+
+
+def json_dumps(obj: object) -> str:
+    """Serialize *obj* to JSON text, keeping non-ASCII characters as is.
+
+    Uses orjson when it is installed and falls back to the stdlib otherwise
+    (also for values orjson refuses, such as non-string dict keys).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False)
@@ -0,0 +1,28 @@
+import pytest
+
+from gigabot.agent.tools.filesystem import _read_text_with_encoding
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Привет мир",
+        "Договор поставки бетона",
+        "Да",
+        "ИНН 7701234567 КПП 770101001",
+        "Счёт на оплату №15",
+        "Смета",
+        "Ок, спасибо!",
+        "Акт выполненных работ за март",
+    ],
+)
+def test_short_cp1251_text(tmp_path, text):
+    path = tmp_path / "note.txt"
+    path.write_bytes(text.encode("cp1251"))
+    assert _read_text_with_encoding(path) == text
+
+
+def test_utf8_text(tmp_path):
+    path = tmp_path / "note.txt"
+    path.write_text("Привет, мир", encoding="utf-8")
+    assert _read_text_with_encoding(path) == "Привет, мир"